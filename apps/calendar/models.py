@@ -45,6 +45,8 @@ class Event(models.Model):
             models.Index(fields=['centre', 'event_date']),
             models.Index(fields=['class_instance', 'event_date']),
             models.Index(fields=['event_type']),
+            # Keyset pagination order for the event list
+            models.Index(fields=['event_date', 'id']),
         ]
     
     def __str__(self):
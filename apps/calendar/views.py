@@ -15,10 +15,10 @@ from .serializers import EventSerializer, EventCreateSerializer
         tags=['Calendar'],
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number for pagination'
+                description='Pagination cursor taken from the previous response'
             ),
             OpenApiParameter(
                 name='page_size',
@@ -45,6 +45,7 @@ class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('event_date', 'id')
     
     def get_queryset(self):
         user = self.request.user
@@ -55,7 +55,8 @@ class Centre(models.Model):
         verbose_name_plural = 'Centres'
         ordering = ['name']
         indexes = [
-            models.Index(fields=['name']),
+            # Also the keyset pagination order for the centre list
+            models.Index(fields=['name', 'id']),
         ]
     
     def __str__(self):
@@ -92,6 +93,8 @@ class Holiday(models.Model):
         ordering = ['date']
         indexes = [
             models.Index(fields=['centre', 'date']),
+            # Keyset pagination order for the holiday list
+            models.Index(fields=['date', 'id']),
         ]
     
     def __str__(self):
@@ -116,6 +119,8 @@ class TermDate(models.Model):
         ordering = ['start_date']
         indexes = [
             models.Index(fields=['centre', 'start_date']),
+            # Keyset pagination order for the term list
+            models.Index(fields=['start_date', 'id']),
         ]
     
     def __str__(self):
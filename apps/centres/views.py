@@ -16,10 +16,10 @@ from .serializers import (
         tags=['Centres'],
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number for pagination'
+                description='Pagination cursor taken from the previous response'
             ),
             OpenApiParameter(
                 name='page_size',
@@ -185,17 +185,18 @@ class CentreViewSet(viewsets.ModelViewSet):
     queryset = Centre.objects.all()
     serializer_class = CentreSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('name', 'id')
     
     def get_queryset(self):
         user = self.request.user
         
         # Super Admin sees all centres
         if user.role == 'SUPER_ADMIN':
-            return Centre.objects.all()
+            return Centre.objects.all().prefetch_related('holidays', 'term_dates')
         
         # Others see only their centre
         if user.centre:
-            return Centre.objects.filter(id=user.centre.id)
+            return Centre.objects.filter(id=user.centre_id).prefetch_related('holidays', 'term_dates')
         
         return Centre.objects.none()
     
@@ -332,10 +333,10 @@ class CentreViewSet(viewsets.ModelViewSet):
         tags=['Centres'],
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number for pagination'
+                description='Pagination cursor taken from the previous response'
             ),
             OpenApiParameter(
                 name='page_size',
@@ -356,6 +357,7 @@ class HolidayViewSet(viewsets.ModelViewSet):
     queryset = Holiday.objects.all()
     serializer_class = HolidaySerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('date', 'id')
     
     def get_queryset(self):
         user = self.request.user
@@ -375,10 +377,10 @@ class HolidayViewSet(viewsets.ModelViewSet):
         tags=['Centres'],
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number for pagination'
+                description='Pagination cursor taken from the previous response'
             ),
             OpenApiParameter(
                 name='page_size',
@@ -399,6 +401,7 @@ class TermDateViewSet(viewsets.ModelViewSet):
     queryset = TermDate.objects.all()
     serializer_class = TermDateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('start_date', 'id')
     
     def get_queryset(self):
         user = self.request.user
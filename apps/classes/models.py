@@ -101,6 +101,12 @@ class Enrolment(models.Model):
         indexes = [
             models.Index(fields=['student', 'is_active']),
             models.Index(fields=['class_instance', 'is_active']),
+            # Access checks (e.g. whiteboard connect) only look at active enrolments
+            models.Index(
+                fields=['student', 'class_instance'],
+                condition=models.Q(is_active=True),
+                name='active_enrolment_idx'
+            ),
         ]
     
     def __str__(self):
@@ -75,6 +75,9 @@ class ClassSerializer(serializers.ModelSerializer):
         return obj.teacher_assignments.count()
     
     def get_student_count(self, obj):
+        if 'enrolments' in getattr(obj, '_prefetched_objects_cache', {}):
+            # Counted from the prefetched enrolments rather than a query per class
+            return sum(1 for enrolment in obj.enrolments.all() if enrolment.is_active)
         return obj.enrolments.filter(is_active=True).count()
 
 
@@ -32,10 +32,10 @@ from .serializers import (
         """,
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number for pagination'
+                description='Pagination cursor taken from the previous response'
             ),
             OpenApiParameter(
                 name='page_size',
@@ -114,6 +114,7 @@ class ClassViewSet(viewsets.ModelViewSet):
     queryset = Class.objects.all()
     serializer_class = ClassSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('centre_id', 'name', 'id')
     
     def get_queryset(self):
         user = self.request.user
@@ -135,7 +136,7 @@ class ClassViewSet(viewsets.ModelViewSet):
             queryset = Class.objects.filter(
                 enrolments__student=user,
                 enrolments__is_active=True
-            ).select_related('centre').prefetch_related('teacher_assignments__teacher')
+            ).select_related('centre').prefetch_related('teacher_assignments__teacher', 'enrolments__student')
         else:
             queryset = Class.objects.none()
         
@@ -13,14 +13,17 @@ from apps.homework.models import Homework, Submission
 from apps.classes.models import Class, Enrolment
 from apps.users.models import User
 from apps.whiteboard.models import WhiteboardSession
+from apps.core.mixins import ReadOnlyTransactionMixin
+from apps.core.utils import cache_response_per_user
 
 
-class HomeworkTrendsView(APIView):
+class HomeworkTrendsView(ReadOnlyTransactionMixin, APIView):
     """
     Homework submission trends over time
     """
     permission_classes = [IsAuthenticated]
     
+    @cache_response_per_user(300)
     def get(self, request):
         if request.user.role not in ['CENTRE_MANAGER', 'SUPER_ADMIN']:
             return Response({'error': 'Access denied.'}, status=403)
@@ -91,13 +94,14 @@ class HomeworkTrendsView(APIView):
         })
 
 
-class StudentPerformanceView(APIView):
+class StudentPerformanceView(ReadOnlyTransactionMixin, APIView):
     """
     Student performance analytics
     Shows average marks, completion rates, etc.
     """
     permission_classes = [IsAuthenticated]
     
+    @cache_response_per_user(300)
     def get(self, request):
         if request.user.role not in ['CENTRE_MANAGER', 'SUPER_ADMIN']:
             return Response({'error': 'Access denied.'}, status=403)
@@ -153,12 +157,13 @@ class StudentPerformanceView(APIView):
         })
 
 
-class CentreOverviewView(APIView):
+class CentreOverviewView(ReadOnlyTransactionMixin, APIView):
     """
     Centre overview analytics
     """
     permission_classes = [IsAuthenticated]
     
+    @cache_response_per_user(300)
     def get(self, request):
         if request.user.role not in ['CENTRE_MANAGER', 'SUPER_ADMIN']:
             return Response({'error': 'Access denied.'}, status=403)
@@ -224,13 +229,14 @@ class CentreOverviewView(APIView):
         })
 
 
-class TeacherPerformanceView(APIView):
+class TeacherPerformanceView(ReadOnlyTransactionMixin, APIView):
     """
     Teacher performance metrics
     Average grading time, feedback quality, etc.
     """
     permission_classes = [IsAuthenticated]
     
+    @cache_response_per_user(300)
     def get(self, request):
         if request.user.role not in ['CENTRE_MANAGER', 'SUPER_ADMIN']:
             return Response({'error': 'Access denied.'}, status=403)
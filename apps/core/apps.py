@@ -1,8 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     verbose_name = 'Core Utilities'
-
+    
+    def ready(self):
+        from apps.core.utils import start_activity_log_writer
+        start_activity_log_writer()
+        
+        # Model choices can't be named by import path (they're class
+        # attributes), so hand drf-spectacular the lists themselves
+        from apps.users.models import User
+        from apps.homework.models import Submission
+        from apps.calendar.models import Event
+        settings.SPECTACULAR_SETTINGS['ENUM_NAME_OVERRIDES'].update({
+            'UserRoleEnum': User.ROLE_CHOICES,
+            'SubmissionStatusEnum': Submission.STATUS_CHOICES,
+            'EventTypeEnum': Event.EVENT_TYPE_CHOICES,
+        })
@@ -0,0 +1,45 @@
+"""
+Logging handlers that keep file I/O off the request thread
+"""
+import atexit
+import os
+import queue
+from logging import FileHandler
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueuedFileHandler(QueueHandler):
+    """
+    Formats records in the calling thread and hands them to a background
+    QueueListener, which appends them to the log file
+    
+    The file is append-only because every worker process writes the same
+    file; rotating it from several processes loses records, so rotation
+    is left to an external tool
+    """
+    
+    def __init__(self, filename, encoding='utf-8'):
+        super().__init__(queue.SimpleQueue())
+        # Records arrive already formatted by this handler (see prepare())
+        self.file_handler = FileHandler(filename, encoding=encoding)
+        self.listener = None
+        self._listener_pid = None
+    
+    def enqueue(self, record):
+        self._ensure_listener()
+        super().enqueue(record)
+    
+    def _ensure_listener(self):
+        """
+        Start the listener thread for this process on first use
+        Forked workers (Celery prefork, preloaded servers) don't inherit the
+        parent's thread, so each process starts its own with a fresh queue
+        Called from emit(), which already holds this handler's lock
+        """
+        if self._listener_pid == os.getpid():
+            return
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, self.file_handler)
+        self.listener.start()
+        self._listener_pid = os.getpid()
+        atexit.register(self.listener.stop)
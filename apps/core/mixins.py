@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import connection, models, transaction
 
 
 class CentreFilterMixin:
@@ -18,6 +18,19 @@ class CentreFilterMixin:
         return queryset.none()
 
 
+class ReadOnlyTransactionMixin:
+    """
+    Run the whole request in one READ ONLY transaction
+    Its queries share a single snapshot and Postgres rejects any write
+    """
+    
+    def dispatch(self, request, *args, **kwargs):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION READ ONLY')
+            return super().dispatch(request, *args, **kwargs)
+
+
 class TimestampMixin(models.Model):
     """
     Abstract model to add created_at and updated_at timestamps
@@ -0,0 +1,16 @@
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class SingleRendererContentNegotiation(DefaultContentNegotiation):
+    """
+    Skip Accept-header matching when a view has only one renderer
+    API views only render JSON; views with several renderers (e.g. the
+    OpenAPI schema's YAML/JSON) still negotiate as usual. Parser selection
+    is unchanged so multipart uploads keep working.
+    """
+    
+    def select_renderer(self, request, renderers, format_suffix=None):
+        if len(renderers) == 1:
+            renderer = renderers[0]
+            return (renderer, renderer.media_type)
+        return super().select_renderer(request, renderers, format_suffix)
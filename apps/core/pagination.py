@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination
+    Each page is an index range scan, so cost doesn't grow with page depth
+    Viewsets keep their model's natural order by setting cursor_ordering
+    (ending in 'id' as a tie-breaker), backed by a matching model index;
+    the rest page newest first by id
+    Page size comes from REST_FRAMEWORK['PAGE_SIZE']
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering:
+            return ordering
+        return super().get_ordering(request, queryset, view)
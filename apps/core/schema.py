@@ -0,0 +1,17 @@
+"""
+OpenAPI schema hooks for drf-spectacular
+"""
+from functools import lru_cache
+from django.conf import settings
+
+
+@lru_cache(maxsize=1)
+def load_api_description():
+    """Read the API description markdown once, on first schema generation"""
+    return (settings.BASE_DIR / 'config' / 'api_description.md').read_text(encoding='utf-8')
+
+
+def add_api_description(result, generator, request, public):
+    """Postprocessing hook: fill in info.description from api_description.md"""
+    result['info']['description'] = load_api_description()
+    return result
@@ -9,7 +9,7 @@ from datetime import timedelta
 from apps.homework.models import Homework, Submission
 from apps.users.models import User, ParentStudentLink
 from apps.classes.models import Enrolment
-from apps.whiteboard.models import WhiteboardSession
+from apps.whiteboard.models import WhiteboardSession, WhiteboardSnapshot
 
 
 @shared_task
@@ -226,6 +226,33 @@ def cleanup_old_sessions():
     return f"Closed {count} old whiteboard sessions"
 
 
+@shared_task
+def migrate_whiteboard_snapshots(batch_size=200):
+    """
+    Move legacy JSON snapshot data into the compressed snapshot_blob column
+    Safe to re-run; only rows still holding JSON are touched
+    """
+    migrated = 0
+    
+    while True:
+        batch = list(
+            WhiteboardSnapshot.objects.filter(
+                snapshot_blob__isnull=True,
+                snapshot_data__isnull=False
+            ).only('id', 'snapshot_data')[:batch_size]
+        )
+        if not batch:
+            break
+        
+        for snapshot in batch:
+            snapshot.canvas = snapshot.snapshot_data
+        
+        WhiteboardSnapshot.objects.bulk_update(batch, ['snapshot_blob', 'snapshot_data'])
+        migrated += len(batch)
+    
+    return f"Migrated {migrated} whiteboard snapshots"
+
+
 @shared_task
 def generate_centre_report(centre_id):
     """
@@ -1,15 +1,146 @@
+import atexit
+import hashlib
+import ipaddress
+import logging
+import queue
+import threading
+import time
 from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from rest_framework.response import Response
 from apps.users.models import ActivityLog
 
 
+logger = logging.getLogger(__name__)
+
+# Activity logs are written by a background thread so the INSERT
+# never sits on the request path (login, password change, ...).
+# Rows are batched: one bulk INSERT per ACTIVITY_LOG_BATCH_SIZE rows or
+# ACTIVITY_LOG_FLUSH_SECONDS, whichever comes first.
+ACTIVITY_LOG_BATCH_SIZE = 100
+ACTIVITY_LOG_FLUSH_SECONDS = 1.0
+
+_activity_queue = queue.Queue()
+_activity_writer_lock = threading.Lock()
+_activity_writer = None
+
+
+def _flush_activity_logs(batch):
+    """
+    Insert a batch of queued activity logs in one round trip
+    If the batch fails, retry row by row so one bad row only loses itself
+    """
+    try:
+        close_old_connections()
+        try:
+            ActivityLog.objects.bulk_create(
+                [ActivityLog(**fields) for fields in batch],
+                batch_size=500
+            )
+        except Exception:
+            logger.exception('Activity log batch of %d rows failed; retrying one by one', len(batch))
+            for fields in batch:
+                try:
+                    ActivityLog.objects.create(**fields)
+                except Exception:
+                    logger.exception('Dropped activity log row: %r', fields)
+    except Exception:
+        # Don't let a failed write stop the writer
+        logger.exception('Activity log writer failed to flush %d rows', len(batch))
+    finally:
+        for _ in batch:
+            _activity_queue.task_done()
+
+
+def _write_activity_logs():
+    """Drain queued activity logs into the database in batches"""
+    while True:
+        batch = [_activity_queue.get()]
+        deadline = time.monotonic() + ACTIVITY_LOG_FLUSH_SECONDS
+        while len(batch) < ACTIVITY_LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_activity_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        _flush_activity_logs(batch)
+
+
+@atexit.register
+def _drain_activity_logs():
+    """Write whatever is still queued when the process exits"""
+    batch = []
+    while True:
+        try:
+            batch.append(_activity_queue.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _flush_activity_logs(batch)
+
+
+def start_activity_log_writer():
+    """
+    Start the writer thread for this process (called from CoreConfig.ready)
+    Also restarts it in forked workers, where the parent's thread is gone
+    """
+    global _activity_writer
+    if _activity_writer is not None and _activity_writer.is_alive():
+        return
+    with _activity_writer_lock:
+        if _activity_writer is None or not _activity_writer.is_alive():
+            _activity_writer = threading.Thread(
+                target=_write_activity_logs,
+                name='activity-log-writer',
+                daemon=True
+            )
+            _activity_writer.start()
+
+
+def queue_activity_log(user, action_type, description, request):
+    """
+    Queue an ActivityLog row for the background writer
+    Set ACTIVITY_LOG_ASYNC = False to write synchronously (e.g. in tests)
+    """
+    fields = {
+        'user_id': user.pk if user is not None else None,
+        'action_type': action_type,
+        'description': description,
+        'ip_address': get_client_ip(request),
+        'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+        # Stamp the event now, not when the writer gets to it
+        'timestamp': timezone.now(),
+    }
+    
+    if not getattr(settings, 'ACTIVITY_LOG_ASYNC', True):
+        ActivityLog.objects.create(**fields)
+        return
+    
+    start_activity_log_writer()
+    # Only hand the row over once the surrounding transaction has committed
+    transaction.on_commit(lambda: _activity_queue.put(fields))
+
+
 def get_client_ip(request):
-    """Extract client IP address from request"""
+    """
+    Extract client IP address from request
+    X-Forwarded-For is client-controlled, so anything that isn't a valid
+    IP address is stored as None rather than failing the INSERT
+    """
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
+        ip = x_forwarded_for.split(',')[0].strip()
     else:
         ip = request.META.get('REMOTE_ADDR')
-    return ip
+    try:
+        return str(ipaddress.ip_address(ip))
+    except ValueError:
+        return None
 
 
 def log_activity(action_type, description_template):
@@ -25,13 +156,7 @@ def log_activity(action_type, description_template):
             # Only log if request was successful
             if response.status_code < 400:
                 try:
-                    ActivityLog.objects.create(
-                        user=request.user,
-                        action_type=action_type,
-                        description=description_template,
-                        ip_address=get_client_ip(request),
-                        user_agent=request.META.get('HTTP_USER_AGENT', '')
-                    )
+                    queue_activity_log(request.user, action_type, description_template, request)
                 except Exception:
                     # Don't fail the request if logging fails
                     pass
@@ -45,11 +170,34 @@ def log_sensitive_access(user, resource_type, resource_id, request):
     """
     Log access to sensitive data
     """
-    ActivityLog.objects.create(
-        user=user,
-        action_type='SENSITIVE_DATA_ACCESS',
-        description=f'Accessed {resource_type} with ID {resource_id}',
-        ip_address=get_client_ip(request),
-        user_agent=request.META.get('HTTP_USER_AGENT', '')
+    queue_activity_log(
+        user,
+        'SENSITIVE_DATA_ACCESS',
+        f'Accessed {resource_type} with ID {resource_id}',
+        request
     )
 
+
+def cache_response_per_user(timeout):
+    """
+    Cache a view method's response data per user, role and URL
+    Wraps the handler, so authentication, permissions and throttling have
+    already run on every request, including cache hits
+    Usage: @cache_response_per_user(300) on an APIView's get()
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = f'view:{request.user.pk}:{request.user.role}:{path_hash}'
+            
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            
+            response = func(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout)
+            return response
+        return wrapper
+    return decorator
@@ -48,6 +48,8 @@ class Homework(models.Model):
         indexes = [
             models.Index(fields=['class_instance', 'due_date']),
             models.Index(fields=['teacher']),
+            # Keyset pagination order for the homework list
+            models.Index(fields=['-due_date', '-id']),
         ]
     
     def __str__(self):
@@ -60,9 +62,19 @@ class Homework(models.Model):
     def get_submission_stats(self):
         """Get submission statistics"""
         total_students = self.class_instance.enrolments.filter(is_active=True).count()
-        submissions = self.submissions.all()
-        submitted = submissions.filter(status='SUBMITTED').count() + submissions.filter(status='GRADED').count()
-        graded = submissions.filter(status='GRADED').count()
+        
+        if 'submissions' in getattr(self, '_prefetched_objects_cache', {}):
+            # Tallied in Python so prefetched submissions are reused
+            statuses = [submission.status for submission in self.submissions.all()]
+            graded = statuses.count('GRADED')
+            submitted = statuses.count('SUBMITTED') + graded
+        else:
+            counts = self.submissions.aggregate(
+                submitted=models.Count('id', filter=models.Q(status__in=['SUBMITTED', 'GRADED'])),
+                graded=models.Count('id', filter=models.Q(status='GRADED')),
+            )
+            submitted = counts['submitted']
+            graded = counts['graded']
         
         return {
             'total_students': total_students,
@@ -82,11 +82,12 @@ class HomeworkSerializer(serializers.ModelSerializer):
     def get_my_submission(self, obj):
         request = self.context.get('request')
         if request and request.user.role == 'STUDENT':
-            try:
-                submission = Submission.objects.get(homework=obj, student=request.user)
-                return SubmissionSerializer(submission).data
-            except Submission.DoesNotExist:
-                return None
+            # Prefetched into my_submissions by the viewset (one query for the page)
+            if hasattr(obj, 'my_submissions'):
+                submission = obj.my_submissions[0] if obj.my_submissions else None
+            else:
+                submission = obj.submissions.filter(student=request.user).first()
+            return SubmissionSerializer(submission).data if submission else None
         return None
 
 
@@ -1,6 +1,7 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Prefetch
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
@@ -35,10 +36,10 @@ from .serializers import (
         """,
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number for pagination'
+                description='Pagination cursor taken from the previous response'
             ),
             OpenApiParameter(
                 name='page_size',
@@ -106,6 +107,7 @@ class HomeworkViewSet(viewsets.ModelViewSet):
     queryset = Homework.objects.all()
     serializer_class = HomeworkSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-due_date', '-id')
     
     def get_queryset(self):
         user = self.request.user
@@ -127,7 +129,16 @@ class HomeworkViewSet(viewsets.ModelViewSet):
             queryset = Homework.objects.filter(
                 class_instance__enrolments__student=user,
                 class_instance__enrolments__is_active=True
-            ).select_related('class_instance', 'teacher')
+            ).select_related('class_instance', 'teacher').prefetch_related(
+                # Classmates' submissions only feed submission_stats, so
+                # load just their status
+                Prefetch('submissions', queryset=Submission.objects.only('id', 'homework_id', 'status')),
+                Prefetch(
+                    'submissions',
+                    queryset=Submission.objects.filter(student=user).select_related('student'),
+                    to_attr='my_submissions'
+                ),
+            )
         else:
             queryset = Homework.objects.none()
         
@@ -423,10 +434,10 @@ class HomeworkViewSet(viewsets.ModelViewSet):
         tags=['Homework'],
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number for pagination'
+                description='Pagination cursor taken from the previous response'
             ),
             OpenApiParameter(
                 name='page_size',
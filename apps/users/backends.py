@@ -0,0 +1,16 @@
+from django.contrib.auth.backends import ModelBackend
+
+
+class PrefetchedUserBackend(ModelBackend):
+    """
+    Authenticate a user instance the caller has already loaded
+    Skips the second lookup ModelBackend performs by USERNAME_FIELD
+    """
+
+    def authenticate(self, request, user=None, password=None, **kwargs):
+        if user is None or password is None:
+            return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,11 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id sized for the login endpoint (~100ms per hash)
+    Hashes made with other parameters are upgraded on the next login
+    """
+    time_cost = 2
+    memory_cost = 65536
+    parallelism = 2
@@ -81,9 +81,11 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name_plural = 'Users'
         ordering = ['-date_joined']
         indexes = [
-            models.Index(fields=['email']),
+            # email is covered by the unique constraint's index
             models.Index(fields=['role']),
             models.Index(fields=['centre']),
+            # Keyset pagination order for the user list
+            models.Index(fields=['-date_joined', '-id']),
         ]
     
     def __str__(self):
@@ -6,6 +6,10 @@ from django.contrib.auth import authenticate
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
+from apps.centres.models import CentreManagerAssignment
+from apps.classes.models import TeacherAssignment, Enrolment
+from apps.core.utils import queue_activity_log
+from apps.homework.models import Homework, Submission
 from .models import User, ActivityLog, ParentStudentLink
 from .serializers import (
     UserSerializer, UserCreateSerializer, UserUpdateSerializer,
@@ -16,6 +20,25 @@ from .serializers import (
 )
 
 
+# Columns read by UserSerializer / UserProfileSerializer; skips password
+# hashes, lockout state and permission flags on list/detail queries.
+# centre is serialized as a primary key, so no join is needed for it.
+USER_SERIALIZED_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'role', 'centre',
+    'is_active', 'date_joined', 'last_login',
+)
+
+# Known role values; unknown ones in ?role= / ?roles= can never match
+VALID_ROLES = frozenset(role for role, _ in User.ROLE_CHOICES)
+
+# Login reuses one instance for authentication, lockout bookkeeping and
+# the UserSerializer response, so every column it touches is loaded up
+# front and none trigger a deferred-field query
+LOGIN_USER_FIELDS = USER_SERIALIZED_FIELDS + (
+    'password', 'failed_login_attempts', 'account_locked_until',
+)
+
+
 def get_client_ip(request):
     """Extract client IP from request"""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -27,14 +50,8 @@ def get_client_ip(request):
 
 
 def log_activity(user, action_type, description, request):
-    """Helper function to log user activity"""
-    ActivityLog.objects.create(
-        user=user,
-        action_type=action_type,
-        description=description,
-        ip_address=get_client_ip(request),
-        user_agent=request.META.get('HTTP_USER_AGENT', '')
-    )
+    """Helper function to log user activity (written in the background)"""
+    queue_activity_log(user, action_type, description, request)
 
 
 @extend_schema_view(
@@ -61,7 +78,7 @@ def log_activity(user, action_type, description, request):
         **Combine Filters:**
         - `?role=TEACHER&centre=1` - Teachers in centre 1
         - `?roles=TEACHER,STUDENT&centre=1` - Teachers and students in centre 1
-        - `?centre=1&page=2` - Users in centre 1, page 2
+        - `?centre=1&cursor=<cursor>` - Next page of users in centre 1
         
         **Available Roles:**
         - SUPER_ADMIN
@@ -78,6 +95,10 @@ def log_activity(user, action_type, description, request):
         - `/api/users/?role=TEACHER&centre=1` - Teachers in centre 1
         - `/api/users/?roles=TEACHER,STUDENT&centre=2&page_size=50` - Teachers and students in centre 2
         
+        **Pagination:**
+        - Cursor-based, newest users first (50 per page by default)
+        - Follow the `next` / `previous` URLs from the response to move between pages
+        
         **Notes:**
         - If both `role` and `roles` are provided, `roles` takes priority
         - Centre filter applies on top of permission-based filtering
@@ -85,10 +106,10 @@ def log_activity(user, action_type, description, request):
         """,
         parameters=[
             OpenApiParameter(
-                name='page',
-                type=OpenApiTypes.INT,
+                name='cursor',
+                type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
-                description='Page number for pagination'
+                description='Pagination cursor taken from the previous response'
             ),
             OpenApiParameter(
                 name='page_size',
@@ -134,6 +155,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-date_joined', '-id')
     
     def get_queryset(self):
         """Filter users based on role and optional roles parameter"""
@@ -147,6 +169,8 @@ class UserViewSet(viewsets.ModelViewSet):
         else:
             queryset = User.objects.filter(id=user.id)
         
+        queryset = queryset.only(*USER_SERIALIZED_FIELDS)
+        
         # Apply role filtering if provided
         # Support both 'roles' (comma-separated) and 'role' (single)
         roles_param = self.request.query_params.get('roles', None)
@@ -155,12 +179,19 @@ class UserViewSet(viewsets.ModelViewSet):
         if roles_param:
             # Priority to 'roles' - supports comma-separated values
             # Example: ?roles=TEACHER,STUDENT,PARENT
-            roles_list = [role.strip().upper() for role in roles_param.split(',')]
-            queryset = queryset.filter(role__in=roles_list)
+            # Duplicates collapse and unknown roles are dropped
+            roles = {role.strip().upper() for role in roles_param.split(',')} & VALID_ROLES
+            if not roles:
+                # Nothing valid to match - skip the database entirely
+                return queryset.none()
+            queryset = queryset.filter(role__in=roles)
         elif role_param:
             # Fallback to 'role' - single value
             # Example: ?role=TEACHER
-            queryset = queryset.filter(role=role_param.strip().upper())
+            role = role_param.strip().upper()
+            if role not in VALID_ROLES:
+                return queryset.none()
+            queryset = queryset.filter(role=role)
         
         # Apply centre filtering if provided
         centre_param = self.request.query_params.get('centre', None)
@@ -169,10 +200,10 @@ class UserViewSet(viewsets.ModelViewSet):
             # Example: ?centre=1
             try:
                 centre_id = int(centre_param)
-                queryset = queryset.filter(centre_id=centre_id)
             except ValueError:
                 # Invalid centre ID, return empty queryset
-                queryset = queryset.none()
+                return queryset.none()
+            queryset = queryset.filter(centre_id=centre_id)
         
         return queryset
     
@@ -204,9 +235,6 @@ class UserViewSet(viewsets.ModelViewSet):
         user = self.get_object()
         
         # Check if user has related data
-        from apps.classes.models import TeacherAssignment, Enrolment
-        from apps.homework.models import Homework, Submission
-        
         issues = []
         
         # Check teacher assignments
@@ -245,7 +273,6 @@ class UserViewSet(viewsets.ModelViewSet):
             
             # Check CentreManagerAssignment if exists
             try:
-                from apps.centres.models import CentreManagerAssignment
                 manager_assignments = CentreManagerAssignment.objects.filter(manager=user).count()
                 if manager_assignments > 0:
                     issues.append(f'{manager_assignments} centre assignment(s)')
@@ -271,14 +298,15 @@ class UserViewSet(viewsets.ModelViewSet):
         try:
             return super().destroy(request, *args, **kwargs)
         except Exception as e:
+            # Only Super Admins get this far (checked above), so the
+            # traceback is always shown
             import traceback
-            error_details = traceback.format_exc()
             
             return Response(
                 {
                     'error': 'Failed to delete user.',
                     'detail': str(e),
-                    'technical_details': error_details if request.user.role == 'SUPER_ADMIN' else 'Contact administrator'
+                    'technical_details': traceback.format_exc()
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
@@ -475,7 +503,7 @@ class AuthViewSet(viewsets.ViewSet):
             )
         
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.only(*LOGIN_USER_FIELDS).get(email=email)
             
             # Check if account is locked
             if user.is_account_locked():
@@ -484,8 +512,8 @@ class AuthViewSet(viewsets.ViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            # Authenticate user
-            authenticated_user = authenticate(request, email=email, password=password)
+            # Authenticate the already-loaded user (PrefetchedUserBackend)
+            authenticated_user = authenticate(request, user=user, password=password)
             
             if authenticated_user:
                 # Reset failed attempts and update last login
@@ -497,6 +525,7 @@ class AuthViewSet(viewsets.ViewSet):
                 # Log successful login
                 log_activity(user, 'LOGIN_SUCCESS', f'User logged in from {get_client_ip(request)}', request)
                 
+                # Serialize the same instance loaded above (no re-fetch)
                 return Response({
                     'access': str(refresh.access_token),
                     'refresh': str(refresh),
@@ -0,0 +1,14 @@
+"""
+msgpack codecs shared by the whiteboard consumer, presence and snapshots
+msgspec reuses an encoder's internal buffer, so one instance per process
+is cheaper than building one per message
+"""
+import msgspec
+from apps.whiteboard.schemas import AnyWhiteboardEvent
+
+
+MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+MSGPACK_DECODER = msgspec.msgpack.Decoder()
+
+# Decodes msgpack frames straight into typed whiteboard events
+EVENT_DECODER = msgspec.msgpack.Decoder(AnyWhiteboardEvent)
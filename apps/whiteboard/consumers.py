@@ -1,11 +1,70 @@
 """
 WebSocket consumers for real-time whiteboard functionality
 This requires Django Channels to be properly configured
+
+Clients that offer the "whiteboard.msgpack" subprotocol exchange binary
+msgpack frames; everyone else keeps using JSON text frames.
 """
-import json
-from channels.generic.websocket import AsyncWebsocketConsumer
+import asyncio
+import base64
+import logging
+import time
+import msgspec
+import orjson
 from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from redis.exceptions import RedisError
+from django.db.models import Exists, OuterRef, Value
+from apps.classes.models import TeacherAssignment, Enrolment
+from apps.whiteboard import presence as room_presence
 from apps.whiteboard.models import WhiteboardSession
+from apps.whiteboard.codec import EVENT_DECODER, MSGPACK_DECODER, MSGPACK_ENCODER
+
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_SUBPROTOCOL = 'whiteboard.msgpack'
+
+# Events a client sends within this window reach the room in one group_send
+BROADCAST_WINDOW_SECONDS = 0.016
+
+
+def _json_default(value):
+    """Inline image/PDF bytes from msgpack clients go to JSON clients as base64"""
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    raise TypeError
+
+
+def _teacher_access(user):
+    """Teachers must be assigned to the class"""
+    return Exists(TeacherAssignment.objects.filter(
+        teacher=user,
+        class_instance_id=OuterRef('class_instance_id')
+    ))
+
+
+def _student_access(user):
+    """Students must be enrolled in the class"""
+    return Exists(Enrolment.objects.filter(
+        student=user,
+        class_instance_id=OuterRef('class_instance_id'),
+        is_active=True
+    ))
+
+
+def _staff_access(user):
+    """Managers and admins have access"""
+    return Value(True)
+
+
+# Role -> builder for the has_access annotation; other roles are denied
+ACCESS_CHECKS = {
+    'TEACHER': _teacher_access,
+    'STUDENT': _student_access,
+    'CENTRE_MANAGER': _staff_access,
+    'SUPER_ADMIN': _staff_access,
+}
 
 
 class WhiteboardConsumer(AsyncWebsocketConsumer):
@@ -14,6 +73,19 @@ class WhiteboardConsumer(AsyncWebsocketConsumer):
     Handles drawing events, text, image uploads, and PDF display
     """
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_msgpack = False
+        self._pending = []
+        self._flush_task = None
+        self._heartbeat_task = None
+        # Live connections in the room, refreshed on join, heartbeat,
+        # presence digests and room_size pushes; broadcasts are skipped
+        # while this is alone. Each count carries the time it was taken
+        # so a late-arriving older count can't overwrite a newer one
+        self._room_size = 0
+        self._room_size_at = 0
+    
     async def connect(self):
         self.session_id = self.scope['url_route']['kwargs']['session_id']
         self.room_group_name = f'whiteboard_{self.session_id}'
@@ -31,147 +103,249 @@ class WhiteboardConsumer(AsyncWebsocketConsumer):
             await self.close(code=1008)
             return
         
-        # Verify session exists and is active
-        session = await self.get_session(self.session_id)
+        # Verify session exists and is active, and that the user has access
+        # to it, in one database round trip
+        session = await self.load_and_authorize(user, self.session_id)
         if not session:
             print(f"[WEBSOCKET] ❌ Session {self.session_id} not found")
             await self.close(code=3000)
             return
         
-        if not session.is_active:
+        if not session['is_active']:
             print(f"[WEBSOCKET] ❌ Session {self.session_id} is not active")
             await self.close(code=3001)
             return
         
         print(f"[WEBSOCKET] ✅ Session {self.session_id} is valid and active")
         
-        # Verify user has access to this session
-        has_access = await self.verify_access(user, session)
-        if not has_access:
+        if not session['has_access']:
             print(f"[WEBSOCKET] ❌ User {user.id} does not have access to session {self.session_id}")
             await self.close(code=3002)
             return
         
         print(f"[WEBSOCKET] ✅ User {user.id} ({user.role}) has access to session")
         
-        # Join room group
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
+        await self._join_room(user)
         
         print(f"[WEBSOCKET] ✅ User {user.id} joined room {self.room_group_name}")
         
-        await self.accept()
+        # Binary msgpack frames for clients that ask for them, JSON otherwise
+        self.use_msgpack = MSGPACK_SUBPROTOCOL in self.scope.get('subprotocols', [])
+        await self.accept(subprotocol=MSGPACK_SUBPROTOCOL if self.use_msgpack else None)
         
         print(f"[WEBSOCKET] ✅ WebSocket connection accepted for user {user.id}")
         
-        # Send join notification to room
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'user_joined',
-                'user_id': user.id,
-                'user_name': user.get_full_name(),
-                'user_role': user.role
-            }
-        )
+        # The room gets one debounced presence digest per burst of joins
+        await room_presence.schedule_broadcast(self.session_id, self.channel_layer, self.room_group_name)
         
-        print(f"[WEBSOCKET] ✅ Sent user_joined notification for {user.get_full_name()}")
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
     
     async def disconnect(self, close_code):
-        user = self.scope['user']
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
         
-        # Send leave notification to room
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'user_left',
-                'user_id': user.id,
-                'user_name': user.get_full_name()
-            }
-        )
+        # Deliver anything still waiting in the batching window
+        if self._flush_task is not None:
+            await self._flush_task
         
-        # Leave room group
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
+        # Leave room group and presence concurrently
+        was_member, _ = await asyncio.gather(
+            room_presence.remove_member(self.session_id, self.channel_name),
+            self.channel_layer.group_discard(self.room_group_name, self.channel_name),
         )
-    
-    async def receive(self, text_data):
-        """Receive message from WebSocket"""
-        data = json.loads(text_data)
-        action_type = data.get('type')
         
+        # Only connections that made it into the room affect presence
+        if was_member:
+            await room_presence.schedule_broadcast(self.session_id, self.channel_layer, self.room_group_name)
+    
+    async def receive(self, text_data=None, bytes_data=None):
+        """Receive message from WebSocket (msgpack binary or JSON text frame)"""
         user = self.scope['user']
         
+        if bytes_data is not None:
+            await self.receive_event(user, bytes_data)
+            return
+        
+        data = orjson.loads(text_data)
+        
         # Add user info to the message
         data['user_id'] = user.id
         data['user_name'] = user.get_full_name()
         data['timestamp'] = data.get('timestamp')
         
         # Broadcast to room group
+        self.queue_broadcast(data)
+    
+    async def send_event(self, payload):
+        """Send a payload in the wire format negotiated on connect"""
+        if self.use_msgpack:
+            await self.send(bytes_data=MSGPACK_ENCODER.encode(payload))
+        else:
+            await self.send(text_data=orjson.dumps(payload).decode())
+    
+    async def receive_event(self, user, bytes_data):
+        """
+        Decode a msgpack frame straight into its typed event struct
+        The sender is stamped by building a new struct, and the result is
+        encoded once for the whole room
+        """
+        try:
+            event = EVENT_DECODER.decode(bytes_data)
+        except msgspec.DecodeError as e:
+            # Any client can send these, so keep them out of the default log output
+            logger.debug('Dropped invalid whiteboard event: %s', e)
+            return
+        
+        event = msgspec.structs.replace(event, user_id=user.id, user_name=user.get_full_name())
+        self.queue_broadcast(MSGPACK_ENCODER.encode(event))
+    
+    async def _join_room(self, user):
+        """
+        Join the room group and presence, then push the new room size to
+        existing members straight away; waiting for the debounced digest
+        would let a member who thought it was alone drop strokes meant
+        for this connection
+        """
+        # Join the group before recording presence, so a member that
+        # counts this connection as live is sure to reach it
+        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+        connections = await room_presence.add_member(self.session_id, self.channel_name, user)
+        counted_at = time.time()
+        self._set_room_size(connections, counted_at)
+        
+        if connections > 1:
+            await self.channel_layer.group_send(
+                self.room_group_name,
+                {
+                    'type': 'room_size',
+                    'connections': connections,
+                    'counted_at': counted_at
+                }
+            )
+    
+    def _set_room_size(self, connections, counted_at):
+        """Cache the room size unless a newer count was already applied"""
+        if counted_at >= self._room_size_at:
+            self._room_size = connections
+            self._room_size_at = counted_at
+    
+    async def _heartbeat(self):
+        """
+        Keep this connection marked live and prune members whose worker
+        died without disconnecting
+        A Redis error skips one beat rather than ending the loop; if a peer
+        pruned this connection meanwhile, it rejoins the group and presence
+        """
+        while True:
+            await asyncio.sleep(room_presence.HEARTBEAT_SECONDS)
+            try:
+                counted_at = time.time()
+                still_live, connections = await room_presence.heartbeat(self.session_id, self.channel_name)
+                if still_live:
+                    self._set_room_size(connections, counted_at)
+                else:
+                    await self._join_room(self.scope['user'])
+                    await room_presence.schedule_broadcast(self.session_id, self.channel_layer, self.room_group_name)
+                
+                if await room_presence.prune_stale(self.session_id, self.channel_layer, self.room_group_name):
+                    await room_presence.schedule_broadcast(self.session_id, self.channel_layer, self.room_group_name)
+            except RedisError:
+                logger.warning('Whiteboard heartbeat failed for %s', self.channel_name, exc_info=True)
+    
+    def queue_broadcast(self, message):
+        """
+        Queue a message (dict, or pre-encoded msgpack bytes) for the room
+        A burst of strokes is flushed as one group_send per window
+        instead of one Redis round trip per frame, and nothing is sent
+        while this connection is alone in the room
+        """
+        if self._room_size <= 1:
+            return
+        
+        self._pending.append(message)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after(BROADCAST_WINDOW_SECONDS))
+    
+    async def _flush_after(self, delay):
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        messages, self._pending = self._pending, []
         await self.channel_layer.group_send(
             self.room_group_name,
             {
-                'type': 'whiteboard_message',
-                'message': data
+                'type': 'whiteboard_batch',
+                'messages': messages
             }
         )
     
     async def whiteboard_message(self, event):
-        """Send whiteboard message to WebSocket"""
-        message = event['message']
-        await self.send(text_data=json.dumps(message))
+        """Send a single whiteboard message (sent by workers predating batching)"""
+        await self.send_event(event['message'])
     
     async def user_joined(self, event):
-        """Send user joined notification"""
-        await self.send(text_data=json.dumps({
+        """Forward a join notice (sent by workers predating presence digests)"""
+        await self.send_event({
             'type': 'user_joined',
             'user_id': event['user_id'],
             'user_name': event['user_name'],
             'user_role': event['user_role']
-        }))
+        })
     
     async def user_left(self, event):
-        """Send user left notification"""
-        await self.send(text_data=json.dumps({
+        """Forward a leave notice (sent by workers predating presence digests)"""
+        await self.send_event({
             'type': 'user_left',
             'user_id': event['user_id'],
             'user_name': event['user_name']
-        }))
+        })
     
-    @database_sync_to_async
-    def get_session(self, session_id):
-        """Get whiteboard session from database"""
-        try:
-            return WhiteboardSession.objects.select_related('class_instance', 'teacher').get(id=session_id)
-        except WhiteboardSession.DoesNotExist:
-            return None
+    async def whiteboard_batch(self, event):
+        """
+        Send a batch of whiteboard messages
+        msgpack clients get one frame holding an array of events; JSON
+        clients keep receiving one text frame per event
+        """
+        messages = event['messages']
+        
+        if self.use_msgpack:
+            # Pre-encoded events are embedded as-is, without re-encoding
+            await self.send(bytes_data=MSGPACK_ENCODER.encode([
+                msgspec.Raw(message) if isinstance(message, bytes) else message
+                for message in messages
+            ]))
+            return
+        
+        for message in messages:
+            if isinstance(message, bytes):
+                message = MSGPACK_DECODER.decode(message)
+            await self.send(text_data=orjson.dumps(message, default=_json_default).decode())
+    
+    async def room_size(self, event):
+        """Update the cached room size (pushed by a joining connection)"""
+        self._set_room_size(event['connections'], event['counted_at'])
+    
+    async def presence(self, event):
+        """Send the room's current member list, pre-encoded by the sender"""
+        self._set_room_size(event['connections'], event['counted_at'])
+        
+        if self.use_msgpack:
+            await self.send(bytes_data=event['msgpack'])
+        else:
+            await self.send(text_data=event['json'])
     
     @database_sync_to_async
-    def verify_access(self, user, session):
-        """Verify user has access to the whiteboard session"""
-        from apps.classes.models import TeacherAssignment, Enrolment
-        
-        # Teachers must be assigned to the class
-        if user.role == 'TEACHER':
-            return TeacherAssignment.objects.filter(
-                teacher=user,
-                class_instance=session.class_instance
-            ).exists()
-        
-        # Students must be enrolled in the class
-        if user.role == 'STUDENT':
-            return Enrolment.objects.filter(
-                student=user,
-                class_instance=session.class_instance,
-                is_active=True
-            ).exists()
-        
-        # Managers and admins have access
-        if user.role in ['CENTRE_MANAGER', 'SUPER_ADMIN']:
-            return True
-        
-        return False
-
+    def load_and_authorize(self, user, session_id):
+        """
+        Fetch the session and check the user's access in a single query
+        Returns a dict (id, is_active, class_instance_id, has_access),
+        or None if the session doesn't exist
+        
+        Runs through database_sync_to_async rather than the async ORM so
+        stale connections are closed around the call (CONN_MAX_AGE)
+        """
+        check = ACCESS_CHECKS.get(user.role)
+        has_access = check(user) if check else Value(False)
+        
+        return WhiteboardSession.objects.filter(id=session_id).annotate(
+            has_access=has_access
+        ).values('id', 'is_active', 'class_instance_id', 'has_access').first()
@@ -1,5 +1,23 @@
+import zstandard
 from django.db import models
 from django.utils import timezone
+from apps.whiteboard.codec import MSGPACK_DECODER, MSGPACK_ENCODER
+
+
+# Balanced compression level; canvas state is dominated by repeated keys
+SNAPSHOT_ZSTD_LEVEL = 3
+
+
+def pack_canvas(data):
+    """Encode canvas state as zstd-compressed msgpack"""
+    return zstandard.ZstdCompressor(level=SNAPSHOT_ZSTD_LEVEL).compress(
+        MSGPACK_ENCODER.encode(data)
+    )
+
+
+def unpack_canvas(blob):
+    """Decode canvas state written by pack_canvas"""
+    return MSGPACK_DECODER.decode(zstandard.ZstdDecompressor().decompress(bytes(blob)))
 
 
 class WhiteboardSession(models.Model):
@@ -27,6 +45,15 @@ class WhiteboardSession(models.Model):
         indexes = [
             models.Index(fields=['class_instance', 'is_active']),
             models.Index(fields=['teacher']),
+            # Keyset pagination order for the session list
+            models.Index(fields=['-started_at', '-id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['class_instance'],
+                condition=models.Q(is_active=True),
+                name='one_active_wb_per_class'
+            ),
         ]
     
     def __str__(self):
@@ -47,7 +74,13 @@ class WhiteboardSnapshot(models.Model):
         on_delete=models.CASCADE,
         related_name='snapshots'
     )
-    snapshot_data = models.JSONField(help_text='Canvas state as JSON')
+    snapshot_blob = models.BinaryField(
+        null=True,
+        editable=False,
+        help_text='Canvas state as zstd-compressed msgpack'
+    )
+    # Legacy storage, emptied by apps.core.tasks.migrate_whiteboard_snapshots
+    snapshot_data = models.JSONField(null=True, blank=True, help_text='Canvas state as JSON (legacy)')
     saved_at = models.DateTimeField(default=timezone.now)
     saved_by = models.ForeignKey(
         'users.User',
@@ -67,4 +100,15 @@ class WhiteboardSnapshot(models.Model):
     
     def __str__(self):
         return f"Snapshot of {self.session.session_name} at {self.saved_at}"
-
+    
+    @property
+    def canvas(self):
+        """Canvas state, read from the compressed blob or the legacy JSON column"""
+        if self.snapshot_blob is not None:
+            return unpack_canvas(self.snapshot_blob)
+        return self.snapshot_data
+    
+    @canvas.setter
+    def canvas(self, data):
+        self.snapshot_blob = pack_canvas(data)
+        self.snapshot_data = None
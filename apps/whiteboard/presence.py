@@ -0,0 +1,181 @@
+"""
+Redis-backed presence tracking for whiteboard rooms
+
+Each room keeps a hash of channel_name -> member info. Joins and leaves
+only touch the hash; a single debounced "presence" digest is then sent
+to the room, so a burst of N joins costs one broadcast instead of N.
+
+A sorted set of channel_name -> last heartbeat tracks which connections
+are still alive. Connections whose worker died without running
+disconnect stop heartbeating and are pruned from presence and from the
+channel-layer group, so group_send only fans out to live channels.
+"""
+import asyncio
+import time
+import orjson
+import redis.asyncio as aioredis
+from django.conf import settings
+from apps.whiteboard.codec import MSGPACK_ENCODER
+
+
+# Window in which joins/leaves are coalesced into one digest
+PRESENCE_DEBOUNCE_SECONDS = 0.5
+
+# Presence keys expire so members leaked by crashed workers self-heal
+PRESENCE_TTL_SECONDS = 2 * 60 * 60
+
+# Live connections refresh their heartbeat this often; ones silent for
+# STALE_AFTER_SECONDS are treated as gone
+HEARTBEAT_SECONDS = 60
+STALE_AFTER_SECONDS = 3 * HEARTBEAT_SECONDS
+
+_redis = None
+
+# Keep references to pending digest tasks so they aren't garbage collected
+_pending_broadcasts = set()
+
+
+def get_redis():
+    """Shared asyncio Redis client for this process"""
+    global _redis
+    if _redis is None:
+        _redis = aioredis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+def members_key(session_id):
+    return f'whiteboard:{session_id}:members'
+
+
+def live_key(session_id):
+    return f'whiteboard:{session_id}:live'
+
+
+def pending_key(session_id):
+    return f'whiteboard:{session_id}:presence_pending'
+
+
+async def add_member(session_id, channel_name, user):
+    """
+    Record a connection in the room's presence hash and live set
+    Returns the number of live connections in the room, including this one
+    """
+    member = orjson.dumps({
+        'user_id': user.id,
+        'user_name': user.get_full_name(),
+        'user_role': user.role,
+    })
+
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.hset(members_key(session_id), channel_name, member)
+        pipe.zadd(live_key(session_id), {channel_name: time.time()})
+        pipe.expire(members_key(session_id), PRESENCE_TTL_SECONDS)
+        pipe.expire(live_key(session_id), PRESENCE_TTL_SECONDS)
+        pipe.zcard(live_key(session_id))
+        results = await pipe.execute()
+    return results[-1]
+
+
+async def remove_member(session_id, channel_name):
+    """Drop a connection from presence; True if it was present"""
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.hdel(members_key(session_id), channel_name)
+        pipe.zrem(live_key(session_id), channel_name)
+        removed, _ = await pipe.execute()
+    return bool(removed)
+
+
+async def heartbeat(session_id, channel_name):
+    """
+    Mark a connection as still alive and keep the room's keys from expiring
+    Returns (still_live, connections): still_live is False when the
+    connection had already been pruned, and connections is the number of
+    live connections in the room
+    """
+    async with get_redis().pipeline(transaction=False) as pipe:
+        # xx only refreshes existing members; ch makes it report the update
+        pipe.zadd(live_key(session_id), {channel_name: time.time()}, xx=True, ch=True)
+        pipe.expire(members_key(session_id), PRESENCE_TTL_SECONDS)
+        pipe.expire(live_key(session_id), PRESENCE_TTL_SECONDS)
+        pipe.zcard(live_key(session_id))
+        updated, _, _, connections = await pipe.execute()
+    return bool(updated), connections
+
+
+async def prune_stale(session_id, channel_layer, group_name):
+    """
+    Remove connections that stopped heartbeating from presence and from
+    the channel-layer group; True if any were removed
+    """
+    redis = get_redis()
+    cutoff = time.time() - STALE_AFTER_SECONDS
+    stale = await redis.zrangebyscore(live_key(session_id), '-inf', cutoff)
+    if not stale:
+        return False
+
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.zrem(live_key(session_id), *stale)
+        pipe.hdel(members_key(session_id), *stale)
+        await pipe.execute()
+
+    await asyncio.gather(*(
+        channel_layer.group_discard(group_name, channel.decode())
+        for channel in stale
+    ))
+    return True
+
+
+async def room_size(session_id):
+    """Number of live connections in the room"""
+    return await get_redis().zcard(live_key(session_id))
+
+
+async def get_members(session_id):
+    """Current members of the room, one entry per user"""
+    members = await get_redis().hvals(members_key(session_id))
+    users = {}
+    for raw in members:
+        member = orjson.loads(raw)
+        users[member['user_id']] = member
+    return list(users.values())
+
+
+async def schedule_broadcast(session_id, channel_layer, group_name):
+    """
+    Send one presence digest to the room after the debounce window
+    Only the first change in a window (across all workers) schedules it
+    """
+    window_ms = int(PRESENCE_DEBOUNCE_SECONDS * 1000)
+    scheduled = await get_redis().set(pending_key(session_id), 1, nx=True, px=window_ms)
+    if not scheduled:
+        return
+
+    task = asyncio.create_task(_broadcast_later(session_id, channel_layer, group_name))
+    _pending_broadcasts.add(task)
+    task.add_done_callback(_pending_broadcasts.discard)
+
+
+async def _broadcast_later(session_id, channel_layer, group_name):
+    await asyncio.sleep(PRESENCE_DEBOUNCE_SECONDS)
+    await prune_stale(session_id, channel_layer, group_name)
+    
+    # Taken before the read, so a join recorded meanwhile (stamped after
+    # its own count) wins over this digest's count
+    counted_at = time.time()
+    users, connections = await asyncio.gather(
+        get_members(session_id),
+        room_size(session_id),
+    )
+    
+    # Encode the digest once in each wire format; recipients send it as-is
+    payload = {'type': 'presence', 'users': users}
+    await channel_layer.group_send(
+        group_name,
+        {
+            'type': 'presence',
+            'msgpack': MSGPACK_ENCODER.encode(payload),
+            'json': orjson.dumps(payload).decode(),
+            'connections': connections,
+            'counted_at': counted_at,
+        }
+    )
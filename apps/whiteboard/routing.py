@@ -1,10 +1,10 @@
 """
 WebSocket URL routing for whiteboard
 """
-from django.urls import re_path
+from django.urls import path
 from . import consumers
 
 websocket_urlpatterns = [
-    re_path(r'ws/whiteboard/(?P<session_id>\d+)/$', consumers.WhiteboardConsumer.as_asgi()),
+    path('ws/whiteboard/<int:session_id>/', consumers.WhiteboardConsumer.as_asgi()),
 ]
 
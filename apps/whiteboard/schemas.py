@@ -0,0 +1,52 @@
+"""
+Typed whiteboard events for the msgpack wire format
+
+Frames from "whiteboard.msgpack" clients are decoded straight into these
+structs (tagged on "type") instead of building a dict per message.
+Unknown event types or malformed fields raise msgspec.ValidationError.
+
+Images and PDFs can be sent inline as raw msgpack bin data instead of a
+URL, which avoids the base64 expansion of embedding them in JSON.
+"""
+from typing import List, Optional, Tuple, Union
+import msgspec
+
+
+class WhiteboardEvent(msgspec.Struct, tag_field='type', kw_only=True, omit_defaults=True):
+    """Fields shared by every event; user_* are stamped by the server"""
+    timestamp: Optional[float] = None
+    user_id: Optional[int] = None
+    user_name: Optional[str] = None
+
+
+class DrawStroke(WhiteboardEvent, tag='draw'):
+    points: List[Tuple[float, float]] = msgspec.field(default_factory=list)
+    color: str = '#000000'
+    width: float = 2
+
+
+class TextEvent(WhiteboardEvent, tag='text'):
+    x: float
+    y: float
+    text: str
+    color: str = '#000000'
+    font_size: float = 16
+
+
+class ImageEvent(WhiteboardEvent, tag='image'):
+    x: float
+    y: float
+    url: Optional[str] = None
+    data: Optional[bytes] = None
+    mime_type: Optional[str] = None
+    width: Optional[float] = None
+    height: Optional[float] = None
+
+
+class PdfEvent(WhiteboardEvent, tag='pdf'):
+    url: Optional[str] = None
+    data: Optional[bytes] = None
+    page: int = 1
+
+
+AnyWhiteboardEvent = Union[DrawStroke, TextEvent, ImageEvent, PdfEvent]
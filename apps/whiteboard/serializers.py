@@ -1,41 +1,54 @@
 from rest_framework import serializers
 from .models import WhiteboardSession, WhiteboardSnapshot
-from apps.users.serializers import UserSerializer
 
 
 class WhiteboardSnapshotSerializer(serializers.ModelSerializer):
-    saved_by = UserSerializer(read_only=True)
+    saved_by = serializers.SerializerMethodField()
+    # Stored compressed in snapshot_blob; the API still speaks JSON
+    snapshot_data = serializers.JSONField(source='canvas')
     
     class Meta:
         model = WhiteboardSnapshot
         fields = ['id', 'session', 'snapshot_data', 'saved_at', 'saved_by', 'name']
         read_only_fields = ['id', 'saved_at']
+    
+    def get_saved_by(self, obj):
+        """Compact author summary (avoids a nested UserSerializer per snapshot)"""
+        user = obj.saved_by
+        if user is None:
+            return None
+        return {
+            'id': user.id,
+            'full_name': user.get_full_name(),
+            'email': user.email
+        }
+
+
+class WhiteboardSnapshotSummarySerializer(WhiteboardSnapshotSerializer):
+    """Snapshot metadata without the canvas payload"""
+    
+    class Meta(WhiteboardSnapshotSerializer.Meta):
+        fields = ['id', 'session', 'saved_at', 'saved_by', 'name']
 
 
 class WhiteboardSessionSerializer(serializers.ModelSerializer):
-    teacher = UserSerializer(read_only=True)
+    teacher = serializers.IntegerField(source='teacher_id', read_only=True)
+    teacher_name = serializers.CharField(source='teacher.get_full_name', read_only=True)
     class_name = serializers.CharField(source='class_instance.name', read_only=True)
-    snapshots = WhiteboardSnapshotSerializer(many=True, read_only=True)
-    duration = serializers.SerializerMethodField()
+    snapshots = WhiteboardSnapshotSummarySerializer(many=True, read_only=True)
+    duration = serializers.IntegerField(source='duration_minutes', read_only=True)
     
     class Meta:
         model = WhiteboardSession
         fields = [
-            'id', 'class_instance', 'class_name', 'teacher', 'session_name',
+            'id', 'class_instance', 'class_name', 'teacher', 'teacher_name', 'session_name',
             'started_at', 'ended_at', 'is_active', 'snapshots', 'duration'
         ]
-        read_only_fields = ['id', 'teacher', 'started_at', 'ended_at']
-    
-    def get_duration(self, obj):
-        """Calculate session duration in minutes"""
-        if obj.ended_at:
-            duration = obj.ended_at - obj.started_at
-            return int(duration.total_seconds() / 60)
-        return None
+        # Sessions are ended through the end action, never by writing is_active
+        read_only_fields = ['id', 'teacher', 'started_at', 'ended_at', 'is_active']
 
 
 class WhiteboardSessionCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = WhiteboardSession
         fields = ['class_instance', 'session_name']
-
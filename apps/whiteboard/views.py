@@ -1,6 +1,10 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch
+from django.db.models.functions import Extract
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from .models import WhiteboardSession, WhiteboardSnapshot
@@ -27,36 +31,51 @@ class WhiteboardSessionViewSet(viewsets.ModelViewSet):
     queryset = WhiteboardSession.objects.all()
     serializer_class = WhiteboardSessionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-started_at', '-id')
     
     def get_queryset(self):
         user = self.request.user
         
         # Super Admin sees all sessions
         if user.role == 'SUPER_ADMIN':
-            return WhiteboardSession.objects.all().select_related(
+            queryset = WhiteboardSession.objects.all().select_related(
                 'class_instance', 'teacher'
-            ).prefetch_related('snapshots')
+            )
         
         # Centre Manager sees all sessions in their centre
-        if user.role == 'CENTRE_MANAGER' and user.centre:
-            return WhiteboardSession.objects.filter(
+        elif user.role == 'CENTRE_MANAGER' and user.centre:
+            queryset = WhiteboardSession.objects.filter(
                 class_instance__centre=user.centre
-            ).select_related('class_instance', 'teacher').prefetch_related('snapshots')
+            ).select_related('class_instance', 'teacher')
         
         # Teachers see sessions for their classes
-        if user.role == 'TEACHER':
-            return WhiteboardSession.objects.filter(
+        elif user.role == 'TEACHER':
+            queryset = WhiteboardSession.objects.filter(
                 class_instance__teacher_assignments__teacher=user
-            ).select_related('class_instance', 'teacher').prefetch_related('snapshots')
+            ).select_related('class_instance', 'teacher')
         
         # Students see sessions for enrolled classes
-        if user.role == 'STUDENT':
-            return WhiteboardSession.objects.filter(
+        elif user.role == 'STUDENT':
+            queryset = WhiteboardSession.objects.filter(
                 class_instance__enrolments__student=user,
                 class_instance__enrolments__is_active=True
             ).select_related('class_instance', 'teacher')
         
-        return WhiteboardSession.objects.none()
+        else:
+            return WhiteboardSession.objects.none()
+        
+        # Snapshot canvas data can be megabytes per row; lists only carry
+        # metadata and the full payload is served by the snapshots action
+        snapshots = WhiteboardSnapshot.objects.select_related('saved_by').defer(
+            'snapshot_blob', 'snapshot_data'
+        )
+        
+        # Session length in whole minutes, computed by the database (NULL while active)
+        return queryset.prefetch_related(
+            Prefetch('snapshots', queryset=snapshots)
+        ).annotate(
+            duration_minutes=Extract(F('ended_at') - F('started_at'), 'epoch') / 60
+        )
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -82,24 +101,31 @@ class WhiteboardSessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check if there's already an active session for this class
-        active_session = WhiteboardSession.objects.filter(
-            class_instance=class_instance,
-            is_active=True
-        ).first()
-        
-        if active_session:
+        # One active session per class is enforced by the
+        # one_active_wb_per_class partial unique constraint
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+        except IntegrityError:
             return Response(
                 {'error': 'There is already an active session for this class.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        self.perform_create(serializer)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     def perform_create(self, serializer):
         serializer.save(teacher=self.request.user)
     
+    def perform_update(self, serializer):
+        # Moving an active session onto a class that already has one
+        # trips one_active_wb_per_class
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise ValidationError({'error': 'There is already an active session for this class.'})
+    
     @action(detail=True, methods=['post'], url_path='end')
     def end_session(self, request, pk=None):
         """End a whiteboard session (teacher only)"""
@@ -118,6 +144,8 @@ class WhiteboardSessionViewSet(viewsets.ModelViewSet):
             )
         
         session.end_session()
+        # Reload so the serializer sees the database-computed duration
+        session = self.get_queryset().get(pk=session.pk)
         serializer = self.get_serializer(session)
         return Response(serializer.data)
     
@@ -171,7 +199,7 @@ class WhiteboardSessionViewSet(viewsets.ModelViewSet):
         session = self.get_object()
         
         if request.method == 'GET':
-            snapshots = WhiteboardSnapshot.objects.filter(session=session)
+            snapshots = WhiteboardSnapshot.objects.filter(session=session).select_related('saved_by')
             serializer = WhiteboardSnapshotSerializer(snapshots, many=True)
             return Response(serializer.data)
         
@@ -37,13 +37,13 @@ INSTALLED_APPS = [
     'drf_spectacular',
     
     # Local apps
-    'apps.users',
-    'apps.centres',
-    'apps.classes',
-    'apps.homework',
-    'apps.calendar',
-    'apps.whiteboard',
-    'apps.core',
+    'apps.users.apps.UsersConfig',
+    'apps.centres.apps.CentresConfig',
+    'apps.classes.apps.ClassesConfig',
+    'apps.homework.apps.HomeworkConfig',
+    'apps.calendar.apps.CalendarConfig',
+    'apps.whiteboard.apps.WhiteboardConfig',
+    'apps.core.apps.CoreConfig',
 ]
 
 MIDDLEWARE = [
@@ -105,12 +105,48 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Under ASGI each request's sync ORM work gets its own thread-local
+        # connection, so persistent connections are never reused and pile
+        # up; keep 0 there and put a pooler (pgbouncer) in front to reuse them
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # Views opt into transactions themselves (transaction.atomic,
+        # ReadOnlyTransactionMixin) rather than wrapping every request
+        'ATOMIC_REQUESTS': False,
+        'OPTIONS': {
+            'connect_timeout': 5,
+            'application_name': 'school_portal',
+            # Bound runaway queries and abandoned transactions (milliseconds);
+            # set DB_STATEMENT_TIMEOUT=0 for long migrations
+            'options': '-c statement_timeout={} -c idle_in_transaction_session_timeout={}'.format(
+                config('DB_STATEMENT_TIMEOUT', default=30000, cast=int),
+                config('DB_IDLE_IN_TRANSACTION_TIMEOUT', default=10000, cast=int),
+            ),
+        },
     }
 }
 
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
+# Login hands the already-fetched user to PrefetchedUserBackend;
+# ModelBackend still serves admin and any username/password lookups
+AUTHENTICATION_BACKENDS = [
+    'apps.users.backends.PrefetchedUserBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Password hashing
+# New hashes use Argon2; existing PBKDF2 hashes still verify and are
+# rehashed with Argon2 on the user's next successful login
+PASSWORD_HASHERS = [
+    'apps.users.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -165,18 +201,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_FILTER_BACKENDS': [
-        'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
-    ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,
-    'PAGE_SIZE_QUERY_PARAM': 'page_size',  # Allow client to override page size with ?page_size=50
-    'MAX_PAGE_SIZE': 100,  # Maximum allowed page size
+    # Viewsets filter their own query params in get_queryset; add
+    # filter_backends on a viewset that declares filterset/search/ordering fields
+    'DEFAULT_FILTER_BACKENDS': [],
+    # Keyset pagination (see cursor_ordering): deep pages cost the same as the first one
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 50,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.core.renderers.ORJSONRenderer',
     ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'apps.core.negotiation.SingleRendererContentNegotiation',
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -184,70 +218,17 @@ REST_FRAMEWORK = {
 # DRF Spectacular Settings (OpenAPI 3.0)
 SPECTACULAR_SETTINGS = {
     'TITLE': 'School Portal API',
-    'DESCRIPTION': '''
-# School Portal API Documentation
-
-A comprehensive multi-centre school management system with role-based access control.
-
-## Authentication
-
-This API uses JWT (JSON Web Token) authentication. To authenticate:
-
-1. Obtain tokens by calling `/api/auth/login/` with email and password
-2. Use the access token in the Authorization header: `Bearer <access_token>`
-3. Refresh tokens when they expire using `/api/auth/refresh/`
-
-## User Roles
-
-- **SUPER_ADMIN**: Full system access across all centres
-- **CENTRE_MANAGER**: Manage one centre (classes, teachers, students)
-- **TEACHER**: Access assigned classes only (homework, grading, whiteboard)
-- **STUDENT**: Access own homework, classes, and events
-- **PARENT**: View linked students' information
-
-## Multi-Centre Support
-
-The system supports multiple centres with full data isolation. Users (except Super Admin) 
-only have access to data from their assigned centre.
-
-## Features
-
-### Phase 1: Core Features
-- User management and authentication
-- Centre management with holidays and term dates
-- Class management with teacher assignments
-- Homework creation, submission, and grading
-- Calendar and event management
-
-### Phase 2: Enhanced Features
-- Real-time whiteboard collaboration (WebSocket)
-- Role-specific dashboards
-- Parent-student linking
-- Student profiles with privacy protection
-
-### Phase 3: Advanced Features
-- Analytics and reporting
-- Email notifications
-- Background task processing
-- SMS integration (optional)
-
-## Rate Limiting
-
-- Anonymous requests: 100 per hour
-- Authenticated requests: 1000 per hour
-
-## Pagination
-
-List endpoints return paginated results (20 items per page by default).
-Use `?page=2` to navigate pages.
-
-## File Uploads
-
-Maximum file size: 10MB
-Supported formats: PDF, DOC, DOCX, TXT, JPG, JPEG, PNG, ZIP
-    ''',
+    # The markdown description lives in config/api_description.md and is
+    # only read when the schema is generated (see apps.core.schema)
+    'DESCRIPTION': '',
+    'POSTPROCESSING_HOOKS': [
+        'drf_spectacular.hooks.postprocess_schema_enums',
+        'apps.core.schema.add_api_description',
+    ],
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
+    # Same schema for every caller, so the schema view can be cached
+    'SERVE_PUBLIC': True,
     'COMPONENT_SPLIT_REQUEST': True,
     'SCHEMA_PATH_PREFIX': '/api/',
     
@@ -298,12 +279,8 @@ Supported formats: PDF, DOC, DOCX, TXT, JPG, JPEG, PNG, ZIP
         'disableSearch': False,
     },
     
-    # Enum naming
-    'ENUM_NAME_OVERRIDES': {
-        'UserRoleEnum': 'apps.users.models.User.Role',
-        'SubmissionStatusEnum': 'apps.homework.models.Submission.Status',
-        'EventTypeEnum': 'apps.calendar.models.Event.EventType',
-    },
+    # Enum naming; filled with the model choices in CoreConfig.ready()
+    'ENUM_NAME_OVERRIDES': {},
 }
 
 # JWT Settings
@@ -314,7 +291,8 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
     'ALGORITHM': 'HS256',
-    'SIGNING_KEY': SECRET_KEY,
+    # Bytes once here, so PyJWT doesn't encode the str key on every sign/verify
+    'SIGNING_KEY': SECRET_KEY.encode(),
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
@@ -377,14 +355,41 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@schoolportal.
 # Redis Configuration (Phase 2+)
 REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 
+# Cache (shared across workers via Redis)
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'school_portal',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # A Redis outage degrades to cache misses (cached views are
+            # recomputed, sessions fall back to Postgres) instead of 500s
+            'IGNORE_EXCEPTIONS': True,
+        },
+    }
+}
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+
+# Sessions are read from the cache and only fall back to Postgres on a miss
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 # Celery Configuration (Phase 3)
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/0')
-CELERY_ACCEPT_CONTENT = ['json']
-CELERY_TASK_SERIALIZER = 'json'
-CELERY_RESULT_SERIALIZER = 'json'
+# msgpack is smaller and faster than JSON on the broker; JSON is still
+# accepted so messages queued before the switch can be consumed
+CELERY_ACCEPT_CONTENT = ['msgpack', 'json']
+CELERY_TASK_SERIALIZER = 'msgpack'
+CELERY_RESULT_SERIALIZER = 'msgpack'
+CELERY_EVENT_SERIALIZER = 'msgpack'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Activity logs are queued and written by a background thread;
+# set False to write them inline (e.g. for tests)
+ACTIVITY_LOG_ASYNC = config('ACTIVITY_LOG_ASYNC', default=True, cast=bool)
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -396,9 +401,10 @@ LOGGING = {
         },
     },
     'handlers': {
+        # Request threads only enqueue; a listener thread writes the file
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
+            'class': 'apps.core.log_handlers.QueuedFileHandler',
             'filename': BASE_DIR / 'logs' / 'django.log',
             'formatter': 'verbose',
         },
@@ -424,5 +430,4 @@ LOGGING = {
 
 # Create logs directory if it doesn't exist
 LOGS_DIR = BASE_DIR / 'logs'
-if not LOGS_DIR.exists():
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+LOGS_DIR.mkdir(parents=True, exist_ok=True)
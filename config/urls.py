@@ -5,8 +5,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import JsonResponse
-from rest_framework.routers import DefaultRouter
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
+from rest_framework.routers import SimpleRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 from drf_spectacular.views import (
     SpectacularAPIView,
@@ -19,9 +21,17 @@ from apps.classes.views import ClassViewSet
 from apps.homework.views import HomeworkViewSet, SubmissionViewSet
 from apps.calendar.views import EventViewSet
 from apps.whiteboard.views import WhiteboardSessionViewSet
+from apps.core.dashboards import (
+    TeacherDashboardView, StudentDashboardView, ManagerDashboardView,
+    ParentDashboardView, SuperAdminDashboardView
+)
+from apps.core.analytics import (
+    HomeworkTrendsView, StudentPerformanceView, CentreOverviewView,
+    TeacherPerformanceView
+)
 
 # Create router for API endpoints
-router = DefaultRouter()
+router = SimpleRouter()
 
 # Register viewsets
 router.register(r'users', UserViewSet, basename='user')
@@ -35,12 +45,41 @@ router.register(r'submissions', SubmissionViewSet, basename='submission')
 router.register(r'events', EventViewSet, basename='event')
 router.register(r'whiteboard/sessions', WhiteboardSessionViewSet, basename='whiteboard-session')
 
+# Dashboard and analytics view callables, built once
+teacher_dashboard = TeacherDashboardView.as_view()
+student_dashboard = StudentDashboardView.as_view()
+manager_dashboard = ManagerDashboardView.as_view()
+parent_dashboard = ParentDashboardView.as_view()
+admin_dashboard = SuperAdminDashboardView.as_view()
+
+# Analytics views cache their own data per user for 5 minutes
+homework_trends = HomeworkTrendsView.as_view()
+student_performance = StudentPerformanceView.as_view()
+centre_overview = CentreOverviewView.as_view()
+teacher_performance = TeacherPerformanceView.as_view()
+
+# The generated schema only changes on deploy; the key includes the API
+# version so a version bump serves the new schema immediately. YAML or
+# JSON is negotiated from Accept (or ?format=, part of the URL key), so
+# the cache varies on Accept too
+schema_view = cache_page(
+    60 * 60, key_prefix=f"schema-{settings.SPECTACULAR_SETTINGS['VERSION']}"
+)(vary_on_headers('Accept')(SpectacularAPIView.as_view()))
+
+# Liveness probes hit this every few seconds; the body is encoded once
+HEALTH_BODY = b'{"status":"ok"}'
+
+
+def health(request):
+    return HttpResponse(HEALTH_BODY, content_type='application/json')
+
+
 urlpatterns = [
     # Admin
     path('admin/', admin.site.urls),
     
     # OpenAPI 3.0 Documentation (drf-spectacular)
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/schema/', schema_view, name='schema'),
     path('swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
     path('api-docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='api-docs'),
@@ -49,32 +88,26 @@ urlpatterns = [
     path('api/', include(router.urls)),
     
     # Authentication
-    path('api/auth/', include([
-        path('login/', AuthViewSet.as_view({'post': 'login'}), name='auth-login'),
-        path('logout/', AuthViewSet.as_view({'post': 'logout'}), name='auth-logout'),
-        path('refresh/', TokenRefreshView.as_view(), name='token-refresh'),
-        path('password-reset/', AuthViewSet.as_view({'post': 'password_reset'}), name='password-reset'),
-    ])),
+    path('api/auth/login/', AuthViewSet.as_view({'post': 'login'}), name='auth-login'),
+    path('api/auth/logout/', AuthViewSet.as_view({'post': 'logout'}), name='auth-logout'),
+    path('api/auth/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('api/auth/password-reset/', AuthViewSet.as_view({'post': 'password_reset'}), name='password-reset'),
     
     # Dashboards
-    path('api/dashboard/', include([
-        path('teacher/', __import__('apps.core.dashboards', fromlist=['TeacherDashboardView']).TeacherDashboardView.as_view(), name='teacher-dashboard'),
-        path('student/', __import__('apps.core.dashboards', fromlist=['StudentDashboardView']).StudentDashboardView.as_view(), name='student-dashboard'),
-        path('manager/', __import__('apps.core.dashboards', fromlist=['ManagerDashboardView']).ManagerDashboardView.as_view(), name='manager-dashboard'),
-        path('parent/', __import__('apps.core.dashboards', fromlist=['ParentDashboardView']).ParentDashboardView.as_view(), name='parent-dashboard'),
-        path('admin/', __import__('apps.core.dashboards', fromlist=['SuperAdminDashboardView']).SuperAdminDashboardView.as_view(), name='admin-dashboard'),
-    ])),
+    path('api/dashboard/teacher/', teacher_dashboard, name='teacher-dashboard'),
+    path('api/dashboard/student/', student_dashboard, name='student-dashboard'),
+    path('api/dashboard/manager/', manager_dashboard, name='manager-dashboard'),
+    path('api/dashboard/parent/', parent_dashboard, name='parent-dashboard'),
+    path('api/dashboard/admin/', admin_dashboard, name='admin-dashboard'),
     
     # Analytics (Phase 3)
-    path('api/analytics/', include([
-        path('homework-trends/', __import__('apps.core.analytics', fromlist=['HomeworkTrendsView']).HomeworkTrendsView.as_view(), name='homework-trends'),
-        path('student-performance/', __import__('apps.core.analytics', fromlist=['StudentPerformanceView']).StudentPerformanceView.as_view(), name='student-performance'),
-        path('centre-overview/', __import__('apps.core.analytics', fromlist=['CentreOverviewView']).CentreOverviewView.as_view(), name='centre-overview'),
-        path('teacher-performance/', __import__('apps.core.analytics', fromlist=['TeacherPerformanceView']).TeacherPerformanceView.as_view(), name='teacher-performance'),
-    ])),
+    path('api/analytics/homework-trends/', homework_trends, name='homework-trends'),
+    path('api/analytics/student-performance/', student_performance, name='student-performance'),
+    path('api/analytics/centre-overview/', centre_overview, name='centre-overview'),
+    path('api/analytics/teacher-performance/', teacher_performance, name='teacher-performance'),
     
     # Health check endpoint
-    path('api/health/', lambda request: JsonResponse({'status': 'ok'})),
+    path('api/health/', health),
 ]
 
 # Serve media files in development